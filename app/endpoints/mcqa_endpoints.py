@@ -1,19 +1,61 @@
+import asyncio
+import threading
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from app.schemas.schemas import MCQARequest, MCQAResponse, MCQARequestBatch, MCQAResponseBatch
-from app.models.mcqa_model import MCQAModel, MCQAConfig
-from app.settings import settings
+from app.models.mcqa_model import MCQAModel
+from app.models.batcher import DynamicBatcher
+from app.models.model_loader import load_mcqa_model
+from app.settings import get_settings
 
 ROUTER = APIRouter(prefix="/mcqa", tags=["MCQA"])
 
-config = MCQAConfig(model_directory=settings.model_directory)
-mcqa_model = MCQAModel(config)
+_BATCHER_LOCK = threading.Lock()
+
+
+def get_mcqa_model(request: Request) -> MCQAModel:
+    """
+    Return the MCQA model loaded at application startup.
+
+    Falls back to the cached ``load_mcqa_model`` instance when the router is
+    mounted on an app that did not load one, so every router still shares a
+    single copy of the weights.
+    """
+    mcqa_model = getattr(request.app.state, "mcqa_model", None)
+    return mcqa_model if mcqa_model is not None else load_mcqa_model()
+
+
+def get_mcqa_batcher(request: Request) -> DynamicBatcher:
+    """
+    Return the request batcher created at application startup.
+
+    When the router is mounted on an app that did not create one, a batcher
+    around ``get_mcqa_model`` is created on first use and kept on the app state.
+    """
+    mcqa_batcher = getattr(request.app.state, "mcqa_batcher", None)
+    if mcqa_batcher is not None:
+        return mcqa_batcher
+
+    with _BATCHER_LOCK:
+        mcqa_batcher = getattr(request.app.state, "mcqa_batcher", None)
+        if mcqa_batcher is None:
+            settings = get_settings()
+            mcqa_batcher = DynamicBatcher(
+                get_mcqa_model(request),
+                max_batch_size=settings.batch_max_size,
+                max_delay_ms=settings.batch_max_delay_ms
+            )
+            request.app.state.mcqa_batcher = mcqa_batcher
+
+    return mcqa_batcher
+
 
 @ROUTER.post("/predict", response_model=MCQAResponse)
-def predict(request: MCQARequest):
+async def predict(request: MCQARequest, mcqa_batcher: DynamicBatcher = Depends(get_mcqa_batcher)):
     """
     This endpoint expects a passage and exactly four answer choices. It uses the
-    MCQA model to select the most likely correct choice.
+    MCQA model to select the most likely correct choice. Concurrent requests are
+    batched together into a single forward pass.
 
     Parameters:
     - request (MCQARequest): Input data containing:
@@ -29,14 +71,15 @@ def predict(request: MCQARequest):
     if len(request.choices) != 4:
         raise HTTPException(status_code=400, detail="Exactly 4 choices required")
 
-    pred = mcqa_model.predict_blank(request.passage, request.choices)
+    pred = await mcqa_batcher.predict(request.passage, request.choices)
     return MCQAResponse(prediction=pred)
 
 @ROUTER.post("/predict_chunk", response_model=MCQAResponseBatch)
-def predict_chunk(request: MCQARequestBatch):
+async def predict_chunk(request: MCQARequestBatch, mcqa_model: MCQAModel = Depends(get_mcqa_model)):
     """
     This endpoint expects multiple passages, each with exactly four answer choices.
     It uses the MCQA model to select the most likely correct choice for each chunk.
+    Inference runs in a worker thread so the event loop stays free for other requests.
 
     Parameters:
     - request (MCQARequestBatch): Input data containing:
@@ -55,6 +98,6 @@ def predict_chunk(request: MCQARequestBatch):
             detail="Number of passages does not match number of choices lists"
         )
 
-    preds = mcqa_model.predict_batch(request.passages, request.choices_list)
-    
+    preds = await asyncio.to_thread(mcqa_model.predict_batch, request.passages, request.choices_list)
+
     return MCQAResponseBatch(predictions=preds)
@@ -1,24 +1,121 @@
 import uvicorn
 import logging
 import mlflow
+import socket
+import torch
+import torch.multiprocessing as mp
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from app.utils.logger import setup_logging
 from app.endpoints.mcqa_endpoints import ROUTER as MCQA_ROUTER
-from app.settings import settings
+from app.models.batcher import DynamicBatcher
+from app.models.mcqa_model import INTEGER_QUANTIZATION, MCQAModel
+from app.models.model_loader import build_mcqa_config, create_mcqa_model, load_mcqa_model
+from app.settings import get_settings
 
 setup_logging(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="MCQA API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load the MCQA model once when the application starts, and release its
+    background workers on shutdown.
+
+    Loading here rather than at import keeps module imports cheap and gives
+    each worker process a single model instance shared by all routes. When
+    ``serve_shared_workers`` has already placed shared weights on
+    ``app.state.shared_model``, those are wrapped instead of loaded again.
+    """
+    settings = get_settings()
+    shared_model = getattr(app.state, "shared_model", None)
+    if shared_model is not None:
+        app.state.mcqa_model = create_mcqa_model(shared_model)
+    else:
+        app.state.mcqa_model = load_mcqa_model()
+    app.state.mcqa_batcher = DynamicBatcher(
+        app.state.mcqa_model,
+        max_batch_size=settings.batch_max_size,
+        max_delay_ms=settings.batch_max_delay_ms
+    )
+    yield
+
+    await app.state.mcqa_batcher.stop()
+    if app.state.mcqa_model.metric_logger is not None:
+        app.state.mcqa_model.metric_logger.stop()
+
+
+app = FastAPI(title="MCQA API", lifespan=lifespan)
 app.include_router(MCQA_ROUTER)
 
+
+def _serve_worker(worker_id: int, shared_model: torch.nn.Module, sock: socket.socket) -> None:
+    """
+    Run one Uvicorn worker on a pre-bound socket using shared model weights.
+
+    Args:
+        worker_id (int): Index of the worker, supplied by ``mp.spawn``.
+        shared_model (torch.nn.Module): Model whose parameters live in shared memory.
+        sock (socket.socket): Listening socket shared by all workers.
+    """
+    settings = get_settings()
+    mp.set_sharing_strategy("file_system")
+    app.state.shared_model = shared_model
+    config = uvicorn.Config(app, host=settings.host, port=settings.port)
+    logger.info(f"Worker {worker_id} serving with shared model weights")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve_shared_workers(workers: int) -> None:
+    """
+    Serve the app from several worker processes that share one copy of the weights.
+
+    The model is loaded once in this process, with the same dtype and attention
+    implementation a single worker would use, and its parameters are moved to
+    shared memory before the workers are spawned, so each worker maps the same
+    tensors instead of loading its own copy. Only CPU weights are shared; a
+    worker that moves the model to a GPU makes its own copy.
+
+    Args:
+        workers (int): Number of worker processes to spawn.
+
+    Raises:
+        ValueError: If int8/int4 quantization is configured, since quantized
+            weights are rebuilt per worker and cannot be shared.
+    """
+    settings = get_settings()
+    config = build_mcqa_config()
+    if config.quantization in INTEGER_QUANTIZATION:
+        raise ValueError(
+            f"{config.quantization} quantization cannot be shared between workers; "
+            f"use bf16/fp16 or WORKERS=1"
+        )
+
+    mp.set_sharing_strategy("file_system")
+    shared_model = MCQAModel.load_pretrained(config)
+    shared_model.eval()
+    shared_model.share_memory()
+
+    sock = uvicorn.Config(app, host=settings.host, port=settings.port).bind_socket()
+    logger.info(f"Spawning {workers} workers sharing model weights from {settings.model_directory}")
+    try:
+        mp.spawn(_serve_worker, args=(shared_model, sock), nprocs=workers, join=True)
+    finally:
+        sock.close()
+
+
 if __name__ == "__main__":
+    settings = get_settings()
     logger.info(f"Application started on {settings.host}, {settings.port}")
 
-    uvicorn.run(
-        "app.main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.env == "dev"
-    )
\ No newline at end of file
+    if settings.workers > 1:
+        serve_shared_workers(settings.workers)
+    else:
+        uvicorn.run(
+            "app.main:app",
+            host=settings.host,
+            port=settings.port,
+            reload=settings.env == "dev"
+        )
\ No newline at end of file
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.mcqa_model import MCQAModel
+
+logger = logging.getLogger(__name__)
+
+PendingRequest = Tuple[str, List[str], asyncio.Future]
+
+
+class DynamicBatcher:
+    """
+    Coalesce concurrent single-passage requests into batched forward passes.
+
+    Requests are queued as they arrive. A background task takes the first
+    queued request, waits up to ``max_delay_ms`` for more to arrive (or until
+    ``max_batch_size`` are collected) and runs them through
+    ``MCQAModel.predict_batch`` in one call, resolving each caller's future
+    with its own result.
+
+    Example:
+        >>> batcher = DynamicBatcher(model, max_batch_size=8, max_delay_ms=10)
+        >>> result = await batcher.predict(
+        ...     "The capital of France is [BLANK].",
+        ...     ["London", "Paris", "Berlin", "Madrid"]
+        ... )
+    """
+    def __init__(self, model: MCQAModel, max_batch_size: int = 8, max_delay_ms: float = 10.0) -> None:
+        """
+        Initialise the batcher. The background worker starts on first use.
+
+        Args:
+            model (MCQAModel): Model used to run the batched predictions.
+            max_batch_size (int): Maximum number of requests per forward pass.
+                Capped at the model's ``batch_size_limit``.
+            max_delay_ms (float): How long to wait for a batch to fill once the
+                first request has arrived.
+        """
+        self.model = model
+        self.max_batch_size = max(1, min(max_batch_size, model.config.batch_size_limit))
+        self.max_delay = max_delay_ms / 1000
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def predict(self, passage: str, choices: List[str]) -> Dict[str, Any]:
+        """
+        Queue a single prediction and wait for the batch containing it to run.
+
+        Inputs are validated before queueing so one bad request cannot fail
+        the rest of its batch.
+
+        Args:
+            passage (str): The text containing a [BLANK] placeholder.
+            choices (list[str]): A list of exactly 4 possible choices.
+
+        Returns:
+            dict: The same result ``MCQAModel.predict_blank`` would return.
+
+        Raises:
+            ValidationError: If the passage or choices are invalid.
+            PredictionError: If the batched prediction fails.
+        """
+        self.model._validate_choices(choices)
+        self.model._validate_passage(passage)
+
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((passage, choices, future))
+        return await future
+
+    async def stop(self) -> None:
+        """Cancel the background worker, if running."""
+        if self._worker is None:
+            return
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def _ensure_worker(self) -> None:
+        """
+        Start the background worker on the running event loop.
+
+        The queue and worker are bound to a loop, so they are recreated if
+        the batcher is used from a different loop than before.
+        """
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._run())
+
+    async def _collect(self) -> List[PendingRequest]:
+        """Wait for one request, then gather more until the batch is full or the delay expires."""
+        batch = [await self._queue.get()]
+        deadline = self._loop.time() + self.max_delay
+
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self) -> None:
+        """Collect and run batches until cancelled."""
+        while True:
+            batch = await self._collect()
+            batch = [item for item in batch if not item[2].done()]
+            if not batch:
+                continue
+
+            passages = [passage for passage, _, _ in batch]
+            choices_list = [choices for _, choices, _ in batch]
+
+            try:
+                results = await asyncio.to_thread(self.model.predict_batch, passages, choices_list)
+            except Exception as e:
+                logger.error(f"Batched prediction of {len(batch)} requests failed: {e}")
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
@@ -0,0 +1,68 @@
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+import torch
+from transformers import AutoModelForMultipleChoice
+
+from app.models.mcqa_model import ONNX_FILENAME
+from app.settings import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def export_onnx(
+        model_directory: Union[Path, str],
+        output_path: Optional[Union[Path, str]] = None,
+        opset_version: int = 17
+) -> Path:
+    """
+    Export the MCQA model to ONNX so it can be served with ONNX Runtime.
+
+    Batch size, number of choices and sequence length are exported as dynamic
+    axes, so one graph serves every request shape. ``MCQAModel`` picks the
+    exported file up automatically when it sits in the model directory.
+
+    Args:
+        model_directory (Path | str): Path to the pre-trained model directory.
+        output_path (Path | str, optional): Where to write the graph.
+            Defaults to ``model.onnx`` inside ``model_directory``.
+        opset_version (int): ONNX opset to export with.
+
+    Returns:
+        Path: Path of the exported model.
+    """
+    model_path = Path(model_directory).expanduser().resolve()
+    output_path = Path(output_path) if output_path else model_path / ONNX_FILENAME
+
+    model = AutoModelForMultipleChoice.from_pretrained(model_path)
+    model.eval()
+
+    dummy = {
+        "input_ids": torch.ones((1, 4, 16), dtype=torch.long),
+        "attention_mask": torch.ones((1, 4, 16), dtype=torch.long)
+    }
+    input_axes = {0: "batch", 1: "num_choices", 2: "sequence"}
+
+    torch.onnx.export(
+        model,
+        (),
+        str(output_path),
+        kwargs=dummy,
+        input_names=list(dummy),
+        output_names=["logits"],
+        dynamic_axes={
+            "input_ids": input_axes,
+            "attention_mask": input_axes,
+            "logits": {0: "batch", 1: "num_choices"}
+        },
+        opset_version=opset_version,
+        dynamo=False
+    )
+
+    logger.info(f"Exported ONNX model to {output_path}")
+    return output_path
+
+
+if __name__ == "__main__":
+    export_onnx(get_settings().model_directory)
@@ -1,13 +1,31 @@
 import torch
+import contextlib
+import importlib.util
+import itertools
 import logging
+import numpy as np
+import string
+import threading
 import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
-from typing import List, Union, Any, Dict, Optional
+from typing import List, Union, Any, Dict, Optional, Tuple
 from pathlib import Path
-from transformers import AutoTokenizer, AutoModelForMultipleChoice
+from transformers import AutoTokenizer, AutoModelForMultipleChoice, BitsAndBytesConfig
+from app.utils.metrics import MetricLogger
 
 logger = logging.getLogger(__name__)
 
+CacheKey = Tuple[str, Tuple[str, ...], bool]
+
+ONNX_FILENAME = "model.onnx"
+
+HALF_PRECISION_DTYPES = {"bf16": torch.bfloat16, "fp16": torch.float16}
+INTEGER_QUANTIZATION = ("int8", "int4")
+INPUT_NAMES = ("input_ids", "attention_mask")
+
 class MCQAModelError(Exception):
     """Base exception for MCQA model errors."""
     pass
@@ -31,6 +49,12 @@ class MCQAConfig:
     device: Optional[str] = None
     batch_size_limit: int = 32
     enable_warmup: bool = True
+    cache_size: int = 4096
+    choice_cache_size: int = 4096
+    quantization: Optional[str] = None
+    compile: Optional[bool] = None  # None: compile only when running on CUDA
+    mixed_precision: bool = False
+    mlflow_tracking_uri: Optional[str] = None
 
 
 class MCQAModel:
@@ -50,12 +74,19 @@ class MCQAModel:
             ... )
             >>> print(result["predicted_choice"])
     """
-    def __init__(self, config: MCQAConfig) -> None:
+    def __init__(self, config: MCQAConfig, model: Optional[torch.nn.Module] = None) -> None:
         """
         Initialise the MCQA model and tokenizer.
 
         Args:
             model_directory (str): Path to the pre-trained model directory.
+            model (torch.nn.Module, optional): An already loaded
+                ``AutoModelForMultipleChoice``, e.g. one whose weights live in
+                shared memory. Loaded from ``model_directory`` if omitted.
+
+        If ``model_directory`` contains an exported ``model.onnx`` (see
+        ``app.models.export_onnx``) and ``onnxruntime`` is installed, inference
+        runs through ONNX Runtime instead of PyTorch.
 
         Raises:
             FileNotFoundError: If model directory doesn't exist.
@@ -66,18 +97,55 @@ class MCQAModel:
             raise FileNotFoundError(f"Model directory not found: {model_path}")
 
         self.model_path = model_path
-        self.tokenizer = AutoTokenizer.from_pretrained(model_path)
-        self.model = AutoModelForMultipleChoice.from_pretrained(model_path)
-        self.device = torch.device(
-            config.device if config.device else ("cuda" if torch.cuda.is_available() else "cpu")
-        )
-        self.model.to(self.device)
-        self.model.eval()
+        self.tokenizer = AutoTokenizer.from_pretrained(model_path, use_fast=True)
+        if not self.tokenizer.is_fast:
+            raise MCQAModelError(
+                f"No fast tokenizer available for {model_path}. "
+                f"Save the model with its tokenizer.json to use the Rust tokenizer."
+            )
+        self.onnx_session = self._load_onnx_session() if model is None else None
+
+        if self.onnx_session is not None:
+            self.model = None
+            self.device = torch.device("cpu")
+        else:
+            self.device = self._resolve_device(config)
+            self.model = model if model is not None else self.load_pretrained(config)
+            # With a device_map, accelerate has already placed the (quantized) weights.
+            if not isinstance(getattr(self.model, "hf_device_map", None), dict):
+                self.model.to(self.device)
+            self.model.eval()
+            self.model.requires_grad_(False)
+            if config.quantization in INTEGER_QUANTIZATION and self.device.type == "cpu":
+                self.quantize(config.quantization)
 
         self.max_length = config.max_length
         self.num_choices = config.number_of_choices
         self.set_token_limit()
         self.number_of_choices = config.number_of_choices
+        self.length_buckets = self._build_buckets(64, self.max_length)
+        self.batch_buckets = self._build_buckets(1, config.batch_size_limit)
+        self._leading_special_ids, self._trailing_special_ids = self._special_token_ids()
+        self._splice_safe = self._check_splicing()
+        self._choice_cache: "OrderedDict[str, Tuple[int, ...]]" = OrderedDict()
+        self._choice_cache_lock = threading.Lock()
+
+        self.compiled = False
+        self._compiled_executor: Optional[ThreadPoolExecutor] = None
+        self._eager_model: Optional[torch.nn.Module] = None
+        if self._should_compile():
+            self._compile()
+        elif config.enable_warmup and self.device.type == "cuda":
+            self.warmup()
+
+        self._cache: Optional[OrderedDict] = OrderedDict() if config.cache_size > 0 else None
+        self._cache_lock = threading.Lock()
+        self._inference_lock = threading.Lock()
+        self._staging_buffer: Optional[torch.Tensor] = None
+
+        self.metric_logger: Optional[MetricLogger] = (
+            MetricLogger(config.mlflow_tracking_uri) if config.mlflow_tracking_uri else None
+        )
 
     def set_token_limit(self) -> None:
         """
@@ -99,6 +167,455 @@ class MCQAModel:
 
         logger.info(f"Token limit set to {self.max_length}")
 
+    def _load_onnx_session(self) -> Optional[Any]:
+        """
+        Create an ONNX Runtime session if an exported model is available.
+
+        Uses the CUDA execution provider when the installed ``onnxruntime``
+        supports it, otherwise the CPU provider, with all graph optimisations
+        (operator fusion, constant folding) enabled.
+
+        Returns:
+            Optional[onnxruntime.InferenceSession]: The session, or None if there
+            is no ``model.onnx`` or ``onnxruntime`` is not installed.
+        """
+        onnx_path = self.model_path / ONNX_FILENAME
+        if not onnx_path.exists():
+            return None
+
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            logger.warning(f"Found {onnx_path} but onnxruntime is not installed. Using PyTorch instead.")
+            return None
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+
+        providers = ["CPUExecutionProvider"]
+        if "CUDAExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, "CUDAExecutionProvider")
+
+        session = ort.InferenceSession(str(onnx_path), sess_options=options, providers=providers)
+        logger.info(f"Loaded ONNX model from {onnx_path} with providers {session.get_providers()}")
+        return session
+
+    @staticmethod
+    def _resolve_device(config: MCQAConfig) -> torch.device:
+        """Return the configured device, defaulting to CUDA when available."""
+        return torch.device(config.device if config.device else ("cuda" if torch.cuda.is_available() else "cpu"))
+
+    @classmethod
+    def load_pretrained(cls, config: MCQAConfig) -> torch.nn.Module:
+        """
+        Load the model weights with the configured quantization and a fused attention implementation.
+
+        Used by ``__init__``, and to pre-load weights that are then shared
+        between worker processes. Falls back to the architecture's default
+        attention if it does not support the requested one.
+
+        Args:
+            config (MCQAConfig): Model configuration.
+
+        Returns:
+            torch.nn.Module: The loaded model.
+        """
+        model_path = Path(config.model_directory).expanduser().resolve()
+        device = cls._resolve_device(config)
+        load_options = cls._load_options(config, device)
+
+        attn_implementation = cls._attention_implementation(config, device)
+        try:
+            model = AutoModelForMultipleChoice.from_pretrained(
+                model_path, attn_implementation=attn_implementation, **load_options
+            )
+        except (ValueError, ImportError) as e:
+            logger.warning(f"{attn_implementation} attention unavailable, using the default: {e}")
+            model = AutoModelForMultipleChoice.from_pretrained(model_path, **load_options)
+
+        logger.info(f"Using {getattr(model.config, '_attn_implementation', 'default')} attention")
+        return model
+
+    @staticmethod
+    def _attention_implementation(config: MCQAConfig, device: torch.device) -> str:
+        """
+        Pick the attention kernel to load the model with.
+
+        FlashAttention-2 needs the ``flash-attn`` package, an Ampere or newer
+        GPU and half-precision weights; otherwise PyTorch's fused
+        ``scaled_dot_product_attention`` is used.
+
+        Args:
+            config (MCQAConfig): Model configuration.
+            device (torch.device): Device the model will run on.
+
+        Returns:
+            str: "flash_attention_2" or "sdpa".
+        """
+        if (
+            device.type == "cuda"
+            and config.quantization in HALF_PRECISION_DTYPES
+            and importlib.util.find_spec("flash_attn") is not None
+            and torch.cuda.get_device_capability(device)[0] >= 8
+        ):
+            return "flash_attention_2"
+        return "sdpa"
+
+    @staticmethod
+    def _load_options(config: MCQAConfig, device: torch.device) -> Dict[str, Any]:
+        """
+        Extra ``from_pretrained`` arguments for the configured quantization.
+
+        "bf16" / "fp16" load the weights in half precision. On GPU, "int8" /
+        "int4" load them through bitsandbytes (NF4 with bfloat16 compute for
+        "int4"), placed by accelerate. On CPU, "int8" is instead applied after
+        loading by ``quantize``.
+
+        Args:
+            config (MCQAConfig): Model configuration.
+            device (torch.device): Device the model will run on.
+
+        Returns:
+            Dict[str, Any]: Keyword arguments for ``from_pretrained``.
+
+        Raises:
+            ValueError: If the quantization scheme is not supported.
+            ImportError: If GPU int8/int4 is requested without bitsandbytes and accelerate.
+        """
+        quantization = config.quantization
+        if quantization is None:
+            return {}
+
+        if quantization in HALF_PRECISION_DTYPES:
+            return {"dtype": HALF_PRECISION_DTYPES[quantization]}
+
+        if quantization not in INTEGER_QUANTIZATION:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+
+        if device.type != "cuda":
+            return {}
+
+        missing = [name for name in ("bitsandbytes", "accelerate") if importlib.util.find_spec(name) is None]
+        if missing:
+            raise ImportError(f"{quantization} quantization on GPU requires: {', '.join(missing)}")
+
+        if quantization == "int8":
+            quantization_config = BitsAndBytesConfig(load_in_8bit=True)
+        else:
+            quantization_config = BitsAndBytesConfig(
+                load_in_4bit=True,
+                bnb_4bit_quant_type="nf4",
+                bnb_4bit_compute_dtype=torch.bfloat16
+            )
+
+        return {"quantization_config": quantization_config, "device_map": "auto"}
+
+    def quantize(self, quantization: str) -> None:
+        """
+        Quantize the loaded model for faster inference on CPU.
+
+        Args:
+            quantization (str): Quantization scheme. "int8" applies dynamic int8
+                quantization to the linear layers. GPU quantization happens at
+                load time instead (see ``_load_options``).
+
+        Raises:
+            ValueError: If the quantization scheme is not supported.
+        """
+        if quantization not in INTEGER_QUANTIZATION:
+            raise ValueError(f"Unsupported quantization: {quantization}")
+
+        if self.device.type != "cpu":
+            logger.warning(f"Dynamic int8 quantization is only supported on CPU, not {self.device}. Skipping.")
+            return
+
+        if quantization != "int8":
+            logger.warning(f"{quantization} quantization requires a GPU. Skipping.")
+            return
+
+        self.model = torch.ao.quantization.quantize_dynamic(
+            self.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        logger.info("Applied dynamic int8 quantization to linear layers")
+
+    def _should_compile(self) -> bool:
+        """
+        Decide whether to ``torch.compile`` the model.
+
+        By default only CUDA models are compiled: there CUDA graphs remove most
+        of the per-kernel launch overhead, while on CPU the compile time is
+        rarely paid back. ``MCQAConfig.compile`` forces it on or off.
+
+        Returns:
+            bool: True if the model should be compiled.
+        """
+        if self.model is None:
+            return False
+        if self.config.compile is None:
+            return self.device.type == "cuda"
+        return self.config.compile
+
+    def _compile(self) -> None:
+        """
+        Compile the model, falling back to eager mode if compilation fails.
+
+        Inputs are padded to batch and length buckets (see ``_run_model``), so
+        the compiled model only sees a bounded set of shapes and records one
+        CUDA graph per shape. Dimensions are left to Dynamo's automatic dynamic
+        shapes, so varying shapes cost a couple of recompiles rather than one
+        per bucket. CUDA graph trees are thread-local, so compiled forwards all
+        run on one dedicated thread instead of whichever thread served the request.
+
+        Compilation is lazy, so most failures surface on the first forward pass:
+        during warmup if it is enabled (where the one-off compile cost is also
+        paid instead of on the first request), otherwise on the first request.
+        ``_forward`` reverts to eager mode in either case.
+        """
+        self._eager_model = self.model
+        try:
+            self.model = torch.compile(self._eager_model, mode="reduce-overhead")
+        except Exception as e:
+            logger.warning(f"torch.compile failed, falling back to eager mode: {e}")
+            self.model = self._eager_model
+            return
+
+        self._compiled_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mcqa-compiled")
+        self.compiled = True
+        if self.config.enable_warmup:
+            self.warmup()
+
+    def _revert_to_eager(self) -> None:
+        """Drop the compiled model and its thread, and serve the eager model instead."""
+        executor, self._compiled_executor = self._compiled_executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+        self.model = self._eager_model
+        self.compiled = False
+
+    def warmup(self) -> None:
+        """
+        Run forward passes on dummy input for the shapes ``_run_model`` pads to.
+
+        A compiled model is run at every (batch bucket, length bucket) pair, so
+        graph compilation and CUDA graph capture happen at load time rather than
+        on live traffic. An eager model is run at batch size 1 for every length
+        bucket, to pay CUDA context setup, kernel selection and allocator growth.
+        """
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
+        start_time = time.perf_counter_ns()
+
+        batch_sizes = self.batch_buckets if self.compiled else [1]
+        with torch.inference_mode(), self._autocast():
+            for batch_size, length in itertools.product(batch_sizes, self.length_buckets):
+                shape = (batch_size, self.num_choices, length)
+                self._forward({
+                    "input_ids": torch.ones(shape, dtype=torch.long, device=self.device),
+                    "attention_mask": torch.ones(shape, dtype=torch.long, device=self.device)
+                })
+
+        if self.device.type == "cuda":
+            torch.cuda.synchronize(self.device)
+        logger.info(f"Model warmed up in {(time.perf_counter_ns() - start_time) / 1_000_000:.0f} ms")
+
+    def _to_device(self, tensor: torch.Tensor) -> torch.Tensor:
+        """
+        Move the stacked model inputs to the model's device.
+
+        On GPU the tensor is copied into a reusable pinned staging buffer so the
+        transfer can run asynchronously without pinning fresh memory per call.
+        Callers must hold ``_inference_lock`` when running on GPU.
+
+        Args:
+            tensor (torch.Tensor): Inputs of shape (len(INPUT_NAMES), batch, num_choices, seq_len).
+
+        Returns:
+            torch.Tensor: The inputs on ``self.device``.
+        """
+        if self.device.type != "cuda":
+            return tensor.to(self.device)
+
+        if self._staging_buffer is None or self._staging_buffer.numel() < tensor.numel():
+            size = len(INPUT_NAMES) * self.config.batch_size_limit * self.num_choices * self.max_length
+            self._staging_buffer = torch.empty(max(size, tensor.numel()), dtype=tensor.dtype, pin_memory=True)
+
+        # A prefix of the flat buffer viewed as the input's shape stays contiguous.
+        staging = self._staging_buffer[:tensor.numel()].view(tensor.shape)
+        staging.copy_(tensor)
+        return staging.to(self.device, non_blocking=True)
+
+    def _forward(self, encoding: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """
+        Run the model on padded inputs of shape (batch, num_choices, seq_len).
+
+        Args:
+            encoding (Dict[str, torch.Tensor]): Model inputs on ``self.device``.
+
+        Returns:
+            torch.Tensor: Logits of shape (batch, num_choices).
+        """
+        if self.onnx_session is None:
+            executor = self._compiled_executor
+            if executor is not None:
+                try:
+                    return executor.submit(self._compiled_forward, encoding).result()
+                except torch.cuda.OutOfMemoryError:
+                    raise
+                except Exception as e:
+                    logger.warning(f"Compiled model failed, falling back to eager mode: {e}")
+                    self._revert_to_eager()
+            return self.model(**encoding).logits
+
+        input_names = {node.name for node in self.onnx_session.get_inputs()}
+        inputs = {key: tensor.numpy() for key, tensor in encoding.items() if key in input_names}
+        logits = self.onnx_session.run(["logits"], inputs)[0]
+        return torch.from_numpy(logits)
+
+    def _compiled_forward(self, encoding: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """
+        Run the compiled model; called on the dedicated compiled-model thread.
+
+        Grad mode and autocast are thread-local, so they are entered here rather
+        than inherited from the caller. The logits are cloned because CUDA graph
+        outputs are overwritten by the next replay.
+
+        Args:
+            encoding (Dict[str, torch.Tensor]): Model inputs on ``self.device``.
+
+        Returns:
+            torch.Tensor: Logits of shape (batch, num_choices).
+        """
+        with torch.inference_mode(), self._autocast():
+            return self.model(**encoding).logits.clone()
+
+    def _autocast(self) -> torch.autocast:
+        """
+        Mixed-precision context for the forward pass.
+
+        Uses bfloat16 on CPU and float16 on GPU; a no-op unless
+        ``mixed_precision`` is enabled in the config.
+        """
+        dtype = torch.bfloat16 if self.device.type == "cpu" else torch.float16
+        return torch.autocast(device_type=self.device.type, dtype=dtype, enabled=self.config.mixed_precision)
+
+    def _special_token_ids(self) -> Tuple[List[int], List[int]]:
+        """
+        Find the special tokens the tokenizer wraps around a single sequence.
+
+        Tokenizing a probe string with and without special tokens and locating
+        the bare ids inside the wrapped ones gives e.g. ``[CLS]`` / ``[SEP]`` for
+        BERT-style models, without relying on tokenizer-class specific helpers.
+
+        Returns:
+            Tuple[List[int], List[int]]: Ids added before and after the sequence.
+        """
+        bare = self.tokenizer("a", add_special_tokens=False)["input_ids"]
+        wrapped = self.tokenizer("a")["input_ids"]
+
+        for start in range(len(wrapped) - len(bare) + 1):
+            if wrapped[start:start + len(bare)] == bare:
+                return wrapped[:start], wrapped[start + len(bare):]
+
+        raise MCQAModelError("Could not determine the tokenizer's special tokens")
+
+    def _check_splicing(self) -> bool:
+        """
+        Check whether tokenizing text in pieces gives the same ids as tokenizing it whole.
+
+        This holds for WordPiece-style tokenizers that split on whitespace, but not
+        for byte-level BPE tokenizers, which fold the leading space into the next token.
+
+        Returns:
+            bool: True if passage segments and choices can be tokenized separately.
+        """
+        whole = self.tokenizer("a b", add_special_tokens=False)["input_ids"]
+        pieces = self.tokenizer(["a ", "b"], add_special_tokens=False)["input_ids"]
+        return whole == pieces[0] + pieces[1]
+
+    def _can_splice(self, segments: List[str]) -> bool:
+        """
+        Check whether a passage's segments can be tokenized independently of the choices.
+
+        Every [BLANK] must be separated from its neighbouring text by whitespace or
+        punctuation, otherwise the choice would merge with the adjacent word
+        (e.g. "[BLANK]ian", or "[BLANK]™" since symbols are not word boundaries)
+        when the full text is tokenized.
+
+        Args:
+            segments (List[str]): The passage split at [BLANK].
+
+        Returns:
+            bool: True if spliced ids match tokenizing the substituted text.
+        """
+        if not self._splice_safe:
+            return False
+
+        for before, after in zip(segments, segments[1:]):
+            if (before and not self._is_word_boundary(before[-1])) or \
+                    (after and not self._is_word_boundary(after[0])):
+                return False
+
+        return True
+
+    @staticmethod
+    def _build_buckets(smallest: int, largest: int) -> List[int]:
+        """
+        Sizes inputs are padded to when the model is compiled.
+
+        Powers of two from ``smallest`` up to ``largest``, so a compiled model
+        only ever sees a handful of shapes (and can reuse one CUDA graph per
+        shape) instead of one per distinct batch size or input length.
+
+        Args:
+            smallest (int): First bucket.
+            largest (int): Last bucket, e.g. ``max_length`` or ``batch_size_limit``.
+
+        Returns:
+            List[int]: Bucket sizes in ascending order, ending with ``largest``.
+        """
+        buckets = []
+        size = smallest
+        while size < largest:
+            buckets.append(size)
+            size *= 2
+        buckets.append(largest)
+
+        return buckets
+
+    @staticmethod
+    def _bucket(buckets: List[int], size: int) -> int:
+        """
+        Return the smallest bucket that fits the given size.
+
+        Args:
+            buckets (List[int]): Bucket sizes in ascending order.
+            size (int): Batch size or length of the longest encoded candidate.
+
+        Returns:
+            int: The padded size to use.
+        """
+        for bucket in buckets:
+            if bucket >= size:
+                return bucket
+        return buckets[-1]
+
+    @staticmethod
+    def _is_word_boundary(char: str) -> bool:
+        """
+        Check whether WordPiece's pre-tokenizer splits words at a character.
+
+        BERT-style tokenizers split only on whitespace and punctuation (ASCII
+        punctuation or any Unicode ``P*`` category); symbols such as "€" or "°"
+        stay attached to the surrounding word.
+
+        Args:
+            char (str): A single character.
+
+        Returns:
+            bool: True if the character separates words.
+        """
+        return char.isspace() or char in string.punctuation or unicodedata.category(char).startswith("P")
+
     @staticmethod
     def _validate_passage(passage: str) -> None:
         """
@@ -146,6 +663,29 @@ class MCQAModel:
             if not choice.strip():
                 raise ValidationError(f"Choice {idx} cannot be empty")
 
+    def _is_valid_input(self, passage: str, choices: List[str]) -> bool:
+        """
+        Check a passage and its choices without raising.
+
+        Accepts exactly what ``_validate_passage`` and ``_validate_choices``
+        accept (a passage containing [BLANK] is necessarily non-empty), as one
+        short-circuiting expression for the common all-valid case.
+
+        Args:
+            passage: The text to check.
+            choices: The answer choices to check.
+
+        Returns:
+            bool: True if both are valid.
+        """
+        return (
+            isinstance(passage, str)
+            and "[BLANK]" in passage
+            and isinstance(choices, list)
+            and len(choices) == self.num_choices
+            and all(isinstance(choice, str) and choice.strip() for choice in choices)
+        )
+
     def _validate_batch_inputs(
             self,
             passages: List[str],
@@ -173,115 +713,463 @@ class MCQAModel:
                 f"{self.config.batch_size_limit}"
             )
 
-        for idx, (passage, choices) in enumerate(zip(passages, choices_list)):
+        invalid_idx = next(
+            (
+                idx for idx, (passage, choices) in enumerate(zip(passages, choices_list))
+                if not self._is_valid_input(passage, choices)
+            ),
+            None
+        )
+        if invalid_idx is None:
+            return
+
+        # Re-run the full validators on the failing item only, for a precise message.
+        try:
+            self._validate_passage(passages[invalid_idx])
+            self._validate_choices(choices_list[invalid_idx])
+        except ValidationError as e:
+            raise ValidationError(f"Invalid input at index {invalid_idx}: {e}") from e
+
+    def _cache_get(self, key: CacheKey) -> Optional[Dict[str, Any]]:
+        """
+        Look up a previous prediction for an identical passage and choices.
+
+        Inference is deterministic (eval mode, argmax), so exact matches can be
+        served from the cache without running the model again.
+
+        Args:
+            key: ``(passage, tuple(choices), return_scores)`` for the request.
+
+        Returns:
+            A copy of the cached result, or None on a miss or if caching is disabled.
+        """
+        if self._cache is None:
+            return None
+
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is None:
+                return None
+            self._cache.move_to_end(key)
+
+        return dict(result)
+
+    def _cache_put(self, key: CacheKey, result: Dict[str, Any]) -> None:
+        """
+        Store a prediction, evicting the least recently used entry when full.
+
+        Args:
+            key: ``(passage, tuple(choices), return_scores)`` for the request.
+            result: The prediction to cache.
+        """
+        if self._cache is None:
+            return
+
+        with self._cache_lock:
+            self._cache[key] = dict(result)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.config.cache_size:
+                self._cache.popitem(last=False)
+
+    def _encode_candidates(self, passages: List[str], choices_list: List[List[str]]) -> List[List[List[int]]]:
+        """
+        Build model input ids for each choice substituted into each passage.
+
+        Passages are split at [BLANK]; the segments of every passage in the batch
+        are tokenized together in a single tokenizer call, choices come from a
+        per-choice token cache (see ``_encode_choices``), and the ids are then
+        spliced together per choice, instead of re-tokenizing the full passage
+        once for every choice. Passages where splicing would not give identical
+        ids (see ``_can_splice``) fall back to tokenizing the substituted text.
+
+        Args:
+            passages (List[str]): Passages containing a [BLANK] placeholder.
+            choices_list (List[List[str]]): The answer options for each passage.
+
+        Returns:
+            List[List[List[int]]]: For each passage, one list of input ids (with
+            special tokens) per choice, truncated to ``max_length``.
+        """
+        split_passages = [passage.split("[BLANK]") for passage in passages]
+        spliceable = [self._can_splice(segments) for segments in split_passages]
+
+        texts = [
+            segment
+            for segments, splice in zip(split_passages, spliceable) if splice
+            for segment in segments
+        ]
+        token_ids = iter(self._token_ids(texts, add_special_tokens=False) if texts else [])
+        choice_token_ids = self._encode_choices([
+            choice
+            for choices, splice in zip(choices_list, spliceable) if splice
+            for choice in choices
+        ])
+
+        encoded = []
+        for segments, choices, splice in zip(split_passages, choices_list, spliceable):
+            if not splice:
+                substituted = [choice.join(segments) for choice in choices]
+                encoded.append(
+                    self._token_ids(substituted, truncation=True, max_length=self.max_length)
+                )
+                continue
+
+            segment_ids = [next(token_ids) for _ in segments]
+            choice_ids = [choice_token_ids[choice] for choice in choices]
+            encoded.append(self._splice(segment_ids, choice_ids))
+
+        return encoded
+
+    def _token_ids(self, text: Union[str, List[str]], **kwargs: Any) -> Union[List[int], List[List[int]]]:
+        """
+        Tokenize text and return only the input ids.
+
+        Skips building the attention mask and token type ids, which are derived
+        from the final padded ids instead.
+
+        Args:
+            text (str | List[str]): Text, or a batch of texts, to tokenize.
+            **kwargs: Further tokenizer arguments (e.g. ``add_special_tokens``).
+
+        Returns:
+            List[int] | List[List[int]]: Input ids for the text, or for each text.
+        """
+        return self.tokenizer(
+            text, return_attention_mask=False, return_token_type_ids=False, **kwargs
+        )["input_ids"]
+
+    def _encode_choices(self, choices: List[str]) -> Dict[str, Tuple[int, ...]]:
+        """
+        Tokenize answer choices without special tokens, reusing cached ids.
+
+        The same choices recur across requests, so their ids are kept in a
+        bounded LRU cache of ``choice_cache_size`` entries. Choices missing
+        from the cache are tokenized together in a single tokenizer call.
+
+        Args:
+            choices (List[str]): The answer choices, possibly with repeats.
+
+        Returns:
+            Dict[str, Tuple[int, ...]]: Token ids for each distinct choice.
+        """
+        encoded: Dict[str, Tuple[int, ...]] = {}
+        with self._choice_cache_lock:
+            for choice in choices:
+                if choice in self._choice_cache:
+                    encoded[choice] = self._choice_cache[choice]
+                    self._choice_cache.move_to_end(choice)
+
+        misses = list(dict.fromkeys(choice for choice in choices if choice not in encoded))
+        if not misses:
+            return encoded
+
+        for choice, ids in zip(misses, self._token_ids(misses, add_special_tokens=False)):
+            encoded[choice] = tuple(ids)
+
+        if self.config.choice_cache_size > 0:
+            with self._choice_cache_lock:
+                for choice in misses:
+                    self._choice_cache[choice] = encoded[choice]
+                while len(self._choice_cache) > self.config.choice_cache_size:
+                    self._choice_cache.popitem(last=False)
+
+        return encoded
+
+    def _splice(self, segment_ids: List[List[int]], choice_ids: List[Tuple[int, ...]]) -> List[List[int]]:
+        """
+        Join tokenized passage segments around each tokenized choice.
+
+        Args:
+            segment_ids (List[List[int]]): Token ids of the passage split at [BLANK].
+            choice_ids (List[Tuple[int, ...]]): Token ids of each choice.
+
+        Returns:
+            List[List[int]]: One list of input ids (with special tokens) per choice,
+            truncated to ``max_length``.
+        """
+        leading, trailing = self._leading_special_ids, self._trailing_special_ids
+        budget = self.max_length - len(leading) - len(trailing)
+
+        candidates = []
+        for ids_for_choice in choice_ids:
+            ids = list(segment_ids[0])
+            for segment in segment_ids[1:]:
+                ids += ids_for_choice
+                ids += segment
+            candidates.append(leading + ids[:budget] + trailing)
+
+        return candidates
+
+    def _pad_candidates(self, flat_input_ids: List[List[int]], pad_to: int) -> np.ndarray:
+        """
+        Pad spliced candidate ids into one fixed-width array holding every model input.
+
+        Fills a preallocated int64 array directly rather than going through
+        ``tokenizer.pad``, which re-validates and converts every row.
+
+        Args:
+            flat_input_ids (List[List[int]]): Input ids of every candidate, in order.
+            pad_to (int): Sequence length to pad to.
+
+        Returns:
+            np.ndarray: Array of shape (len(INPUT_NAMES), num_candidates, pad_to)
+            holding the input ids and attention mask, in ``INPUT_NAMES`` order.
+        """
+        pad_id = self.tokenizer.pad_token_id or 0
+        pad_left = self.tokenizer.padding_side == "left"
+
+        padded = np.zeros((len(INPUT_NAMES), len(flat_input_ids), pad_to), dtype=np.int64)
+        input_ids, attention_mask = padded
+        input_ids.fill(pad_id)
+        for row, ids in enumerate(flat_input_ids):
+            columns = slice(pad_to - len(ids), pad_to) if pad_left else slice(0, len(ids))
+            input_ids[row, columns] = ids
+            attention_mask[row, columns] = 1
+
+        return padded
+
+    @staticmethod
+    def _length_groups(
+            encoded: List[List[List[int]]],
+            min_group_size: int = 8,
+            max_length_ratio: float = 1.5
+    ) -> List[List[int]]:
+        """
+        Group passages of similar encoded length into separate forward passes.
+
+        With a single pass every candidate is padded to the longest one in the
+        batch, so one long outlier inflates attention cost for all rows. Passages
+        are sorted by their longest candidate and a new group is started once a
+        passage is at least ``max_length_ratio`` times longer than the shortest
+        one in the current group, provided that group already has
+        ``min_group_size`` passages. Batches of similar lengths, and batches
+        smaller than ``min_group_size``, therefore stay in one pass. All choices
+        for a passage stay in the same group.
+
+        Args:
+            encoded (List[List[List[int]]]): Candidate input ids for each passage.
+            min_group_size (int): Smallest group worth a separate forward pass.
+            max_length_ratio (float): Longest-to-shortest length ratio within a group.
+
+        Returns:
+            List[List[int]]: Passage indices for each forward pass.
+        """
+        if not encoded:
+            return []
+
+        lengths = [max(len(ids) for ids in candidates) for candidates in encoded]
+        order = sorted(range(len(encoded)), key=lengths.__getitem__)
+
+        groups = [[order[0]]]
+        for idx in order[1:]:
+            group = groups[-1]
+            if len(group) >= min_group_size and lengths[idx] >= max_length_ratio * lengths[group[0]]:
+                groups.append([idx])
+            else:
+                group.append(idx)
+
+        return groups
+
+    def _run_model(
+            self,
+            encoded: List[List[List[int]]],
+            return_scores: bool
+    ) -> Tuple[List[int], Optional[List[float]]]:
+        """
+        Pad the candidates for a group of passages and run one forward pass.
+
+        Args:
+            encoded (List[List[List[int]]]): Candidate input ids for each passage.
+            return_scores (bool): Whether to compute the confidence of each prediction.
+
+        Returns:
+            Tuple[List[int], Optional[List[float]]]: Predicted choice index per
+            passage, and its softmax probability (None if return_scores is False).
+
+        Raises:
+            PredictionError: If prediction fails.
+        """
+        batch_size = len(encoded)
+        num_choices = len(encoded[0])
+
+        padded_batch_size = batch_size
+        if self.compiled:
+            # Fill up to the batch bucket with minimal [CLS] [SEP] passages; their
+            # results are dropped below.
+            padded_batch_size = self._bucket(self.batch_buckets, batch_size)
+            filler = [self._leading_special_ids + self._trailing_special_ids] * num_choices
+            encoded = encoded + [filler] * (padded_batch_size - batch_size)
+
+        flat_input_ids = [ids for candidates in encoded for ids in candidates]
+
+        longest = max(len(ids) for ids in flat_input_ids)
+        pad_to = self._bucket(self.length_buckets, longest) if self.compiled else longest
+
+        padded = torch.from_numpy(self._pad_candidates(flat_input_ids, pad_to))
+        shape = (len(INPUT_NAMES), padded_batch_size, num_choices, pad_to)
+
+        # On GPU, held until results are back on the host, so the shared staging
+        # buffer is not overwritten while a non-blocking copy from it is in flight.
+        # CPU and ONNX Runtime inputs never touch that buffer and run concurrently.
+        inference_lock = self._inference_lock if self.device.type == "cuda" else contextlib.nullcontext()
+        with inference_lock:
+            # All inputs go to the device in a single copy and are split there.
+            inputs = dict(zip(INPUT_NAMES, self._to_device(padded.view(shape))))
+
             try:
-                self._validate_passage(passage)
-                self._validate_choices(choices)
-            except ValidationError as e:
-                raise ValidationError(f"Invalid input at index {idx}: {e}") from e
+                with torch.inference_mode(), self._autocast():
+                    logits = self._forward(inputs)[:batch_size].float()
+                    preds = logits.argmax(dim=-1)
+                    confidences = (
+                        torch.log_softmax(logits, dim=-1).gather(-1, preds.unsqueeze(-1)).squeeze(-1).exp()
+                        if return_scores else None
+                    )
 
-    def _predict_helper(self, candidate_texts: List[List[str]]) -> List[Dict[str, Any]]:
+                # Wait for the GPU here, so the forward's cost is paid at one explicit
+                # point rather than hidden in the first host read.
+                if self.device.type == "cuda":
+                    torch.cuda.synchronize(self.device)
+
+                # One device-to-host copy per tensor rather than an .item() per passage.
+                return preds.tolist(), confidences.tolist() if confidences is not None else None
+            except torch.cuda.OutOfMemoryError as e:
+                raise PredictionError(
+                    f"GPU out of memory. Try reducing batch size (current: {batch_size})"
+                ) from e
+            except Exception as e:
+                logger.error(f"Prediction failed: {e}")
+                raise PredictionError(f"Prediction failed: {e}") from e
+
+    def _predict_helper(
+            self,
+            passages: List[str],
+            choices_list: List[List[str]],
+            return_scores: bool = True
+    ) -> List[Dict[str, Any]]:
         """
         Internal helper for running inference on multiple choice candidates.
 
         Args:
-            candidate_texts (List[List[str]]):
-             -   Each element is a list of strings representing answer options
-             -   for a single passage with [BLANK] replaced.
+            passages (List[str]): Passages containing a [BLANK] placeholder.
+            choices_list (List[List[str]]): The answer options for each passage.
+            return_scores (bool): Whether to compute a confidence for each prediction.
+                When False the softmax is skipped and only the argmax is taken.
 
         Returns:
-            List[Dict[str, Any]]: One result per passage with predicted choice & confidence.
+            List[Dict[str, Any]]: One result per passage with predicted choice (& confidence).
 
         Raises:
             PredictionError: If prediction fails.
         """
-        batch_size = len(candidate_texts)
-        num_choices = len(candidate_texts[0])
+        batch_size = len(passages)
 
-        start_time = time.time()
+        start_time = time.perf_counter_ns()
 
-        flat_candidates = [cand for choices in candidate_texts for cand in choices]
+        encoded = self._encode_candidates(passages, choices_list)
 
-        encoding = self.tokenizer(
-            flat_candidates,
-            padding=True,
-            truncation=True,
-            max_length=self.max_length,
-            return_tensors="pt"
-        )
+        results: List[Optional[Dict[str, Any]]] = [None] * batch_size
+        pending = []
+        for idx, candidates in enumerate(encoded):
+            if any(ids != candidates[0] for ids in candidates[1:]):
+                pending.append(idx)
+                continue
 
-        for key in encoding:
-            encoding[key] = encoding[key].view(batch_size, num_choices, -1).to(self.device)
+            # Identical inputs (e.g. [BLANK] truncated past max_length) always tie,
+            # so there is nothing for the model to choose between.
+            logger.warning(f"All choices for passage {idx} encode identically; skipping the forward pass")
+            result = {"predicted_choice": choices_list[idx][0]}
+            if return_scores:
+                result["confidence"] = 1 / len(candidates)
+            results[idx] = result
 
-        try:
-            with torch.inference_mode():
-                outputs = self.model(**encoding)
-                logits = outputs.logits
-                probs = torch.softmax(logits, dim=-1)
-                preds = torch.argmax(probs, dim=-1)
-        except torch.cuda.OutOfMemoryError as e:
-            raise PredictionError(
-                f"GPU out of memory. Try reducing batch size (current: {batch_size})"
-            ) from e
-        except Exception as e:
-            logger.error(f"Prediction failed: {e}")
-            raise PredictionError(f"Prediction failed: {e}") from e
+        for group in self._length_groups([encoded[idx] for idx in pending]):
+            group = [pending[position] for position in group]
+            preds, confidences = self._run_model([encoded[idx] for idx in group], return_scores)
 
-        latency_ms = (time.time() - start_time) * 1000
+            for position, idx in enumerate(group):
+                result = {"predicted_choice": choices_list[idx][preds[position]]}
+                if return_scores:
+                    result["confidence"] = confidences[position]
+                results[idx] = result
 
-        results = []
-        for i in range(batch_size):
-            pred_idx = preds[i].item()
-            best_choice = candidate_texts[i][pred_idx]
-            confidence = probs[i][pred_idx].item()
-            results.append({
-                "predicted_choice": best_choice,
-                "confidence": confidence
-            })
+        latency_ms = (time.perf_counter_ns() - start_time) / 1_000_000
+        if self.metric_logger is not None:
+            metrics = {"mcqa/latency_ms": latency_ms, "mcqa/batch_size": batch_size}
+            if return_scores:
+                metrics.update({
+                    f"mcqa/confidence_{idx}": result["confidence"] for idx, result in enumerate(results)
+                })
+            self.metric_logger.log_metrics(metrics)
 
         return results
 
-    def predict_blank(self, passage: str, choices: List[str]) -> Dict:
+    def predict_blank(self, passage: str, choices: List[str], return_scores: bool = True) -> Dict:
         """
         Predict the correct choice for a passage with a blank.
 
         Args:
             passage (str): The text containing a [BLANK] placeholder.
             choices (list[str]): A list of exactly 4 possible choices.
+            return_scores (bool): Whether to include the confidence score.
 
         Returns:
             dict: Each item contains:
             - "predicted_choice": str
-            - "confidence": float
+            - "confidence": float (only if return_scores is True)
         """
         self._validate_choices(choices)
         self._validate_passage(passage)
 
-        candidate_texts = [[passage.replace("[BLANK]", choice) for choice in choices]]
+        key = (passage, tuple(choices), return_scores)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
 
-        return self._predict_helper(candidate_texts)[0]
+        result = self._predict_helper([passage], [choices], return_scores)[0]
+        self._cache_put(key, result)
+        return result
 
-    def predict_batch(self, passages: List[str], choices_list: List[List[str]]) -> List[Dict]:
+    def predict_batch(
+            self,
+            passages: List[str],
+            choices_list: List[List[str]],
+            return_scores: bool = True
+    ) -> List[Dict]:
         """
         Predict correct choices for multiple passages with blanks.
 
         Args:
             passages (List[str]): List of passages containing a [BLANK] placeholder.
             choices_list (List[List[str]]): List of 4-choice lists, one per passage.
+            return_scores (bool): Whether to include the confidence scores.
 
         Returns:
             dict: Each item contains:
             - "predicted_choice": str
-            - "confidence": float
+            - "confidence": float (only if return_scores is True)
         """
 
         self._validate_batch_inputs(passages, choices_list)
 
         logger.info(f"Predicting for batch of size: {len(passages)}")
 
-        candidate_texts = [
-            [passage.replace("[BLANK]", choice) for choice in choices]
+        keys = [
+            (passage, tuple(choices), return_scores)
             for passage, choices in zip(passages, choices_list)
         ]
+        results = [self._cache_get(key) for key in keys]
+        missing = [idx for idx, result in enumerate(results) if result is None]
+        if not missing:
+            return results
 
-        return self._predict_helper(candidate_texts)
+        predictions = self._predict_helper(
+            [passages[idx] for idx in missing],
+            [choices_list[idx] for idx in missing],
+            return_scores
+        )
+
+        for idx, result in zip(missing, predictions):
+            self._cache_put(keys[idx], result)
+            results[idx] = result
+
+        return results
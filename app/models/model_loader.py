@@ -1,27 +1,99 @@
 import logging
+from functools import lru_cache
+from typing import Optional
+
+import mlflow
+import torch
 
 from app.models.mcqa_model import MCQAModel, MCQAConfig
-from app.settings import settings
+from app.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
-def load_mcqa_model():
+
+def build_mcqa_config() -> MCQAConfig:
+    """
+    Build the model configuration from the application settings.
+
+    Returns:
+        MCQAConfig: Configuration for ``MCQAModel``.
+    """
+    settings = get_settings()
+    return MCQAConfig(
+        model_directory=settings.model_directory,
+        quantization=settings.quantization,
+        compile=settings.compile_model,
+        mixed_precision=settings.mixed_precision,
+        mlflow_tracking_uri=settings.mlflow_tracking_uri if settings.mlflow_enabled else None
+    )
+
+
+@lru_cache(maxsize=1)
+def load_mcqa_model() -> MCQAModel:
     """
     Load the MCQA model locally (optionally log it to a local MLflow run for demonstration)
 
+    The result is cached, so every caller (app lifespan, routers, scripts)
+    shares a single model instance and one copy of the weights. Weights
+    loaded elsewhere go through ``create_mcqa_model`` instead, so they never
+    replace the cached instance.
+    """
+    return create_mcqa_model()
+
+
+def create_mcqa_model(model: Optional[torch.nn.Module] = None) -> MCQAModel:
+    """
+    Build a new MCQA model instance without caching it.
+
     Steps:
-    1. Load pre-trained model from the local directory.
-    2. Start a local MLflow run and log the model as an artifact.
+    1. Load pre-trained model from the local directory, or wrap ``model``.
+    2. If ``mlflow_log_model_on_start`` is set, log the model to an MLflow run.
     3. Return the loaded MCQA model for further use.
+
+    Args:
+        model (torch.nn.Module, optional): Pre-loaded weights to wrap instead
+            of loading them again, e.g. weights shared between worker processes.
+
+    Returns:
+        MCQAModel: The loaded model.
     """
+    settings = get_settings()
     logger.info(f"Loading MCQA model from {settings.model_directory}")
-    config = MCQAConfig(model_directory=settings.model_directory)
-    model = MCQAModel(config)
+    mcqa_model = MCQAModel(build_mcqa_config(), model=model)
+
+    if settings.mlflow_log_model_on_start:
+        log_model_to_mlflow(mcqa_model, settings.mlflow_tracking_uri)
+
+    return mcqa_model
 
 
-    return model
+def log_model_to_mlflow(mcqa_model: MCQAModel, tracking_uri: str) -> None:
+    """
+    Log the model's weights as an artifact of a new MLflow run.
+
+    Serialising the weights takes seconds, so this is opt-in at server start
+    (``mlflow_log_model_on_start``) and otherwise left to the CLI below.
+    Failures are logged rather than raised, so a misconfigured tracking
+    server cannot stop the API from starting.
+
+    Args:
+        mcqa_model (MCQAModel): The loaded model.
+        tracking_uri (str): MLflow tracking URI to log to.
+    """
+    if mcqa_model.model is None:
+        logger.warning("Model is served through ONNX Runtime; skipping MLflow model logging")
+        return
+
+    try:
+        mlflow.set_tracking_uri(tracking_uri)
+        with mlflow.start_run(run_name="mcqa-model"):
+            mlflow.pytorch.log_model(mcqa_model.model, name="mcqa_model")
+        logger.info(f"Logged MCQA model to MLflow at {tracking_uri}")
+    except Exception as e:
+        logger.warning(f"Failed to log MCQA model to MLflow: {e}")
 
 
 if __name__ == "__main__":
     mcqa_model = load_mcqa_model()
-    logger.info("MCQA model loaded successfully")
\ No newline at end of file
+    logger.info("MCQA model loaded successfully")
+    log_model_to_mlflow(mcqa_model, get_settings().mlflow_tracking_uri)
\ No newline at end of file
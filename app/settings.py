@@ -1,10 +1,24 @@
+from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     host: str = "127.0.0.1"
     port: int = 8080
     env: str = "dev"
+    workers: int = 1
+    mlflow_enabled: bool = False
     mlflow_tracking_uri: str = "file:./mlruns_dev"
+    mlflow_log_model_on_start: bool = False
     model_directory: str = "./models/mcqa"
+    quantization: Optional[str] = None
+    compile_model: Optional[bool] = None
+    mixed_precision: bool = False
+    batch_max_size: int = 8
+    batch_max_delay_ms: float = 10.0
 
-settings = Settings()
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the application settings, read from the environment on first use."""
+    return Settings()
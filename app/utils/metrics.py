@@ -0,0 +1,104 @@
+import logging
+import queue
+import threading
+import time
+from typing import Dict, Optional
+
+import mlflow
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class MetricLogger:
+    """
+    Log MLflow metrics from a background thread.
+
+    Callers enqueue metrics with ``log_metrics`` and return immediately; a
+    daemon thread drains the queue and writes to the MLflow tracking store,
+    so tracking-store I/O never sits on the request path. If the queue is
+    full, metrics are dropped rather than blocking the caller.
+
+    Example:
+        >>> metric_logger = MetricLogger(tracking_uri="file:./mlruns_dev")
+        >>> metric_logger.log_metrics({"latency_ms": 42.0})
+        >>> metric_logger.stop()
+    """
+    def __init__(self, tracking_uri: Optional[str] = None, max_queue_size: int = 10000) -> None:
+        """
+        Initialise the logger. The background thread starts on first use.
+
+        Args:
+            tracking_uri (str, optional): MLflow tracking URI to log to.
+                Defaults to MLflow's own configuration.
+            max_queue_size (int): Maximum number of pending metric batches.
+        """
+        self.tracking_uri = tracking_uri
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def log_metrics(self, metrics: Dict[str, float]) -> None:
+        """
+        Queue a set of metrics to be logged as one MLflow step.
+
+        Args:
+            metrics (Dict[str, float]): Metric names and values.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(metrics)
+        except queue.Full:
+            logger.warning(f"Metric queue full, dropping metrics: {list(metrics)}")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Flush pending metrics and stop the background thread.
+
+        Waits at most ``timeout`` seconds in total, so a slow or unreachable
+        tracking server cannot hang shutdown; metrics still pending after that
+        are abandoned with the daemon thread.
+
+        Args:
+            timeout (float): Seconds to wait for pending metrics to be written.
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+
+        deadline = time.monotonic() + timeout
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Metric queue still full at shutdown, abandoning pending metrics")
+            return
+        thread.join(max(0.0, deadline - time.monotonic()))
+
+    def _ensure_started(self) -> None:
+        """Start the background thread if it is not already running."""
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="mlflow-metrics", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Write queued metrics to MLflow until stopped."""
+        if self.tracking_uri:
+            mlflow.set_tracking_uri(self.tracking_uri)
+
+        step = 0
+        while True:
+            metrics = self._queue.get()
+            if metrics is _STOP:
+                break
+
+            try:
+                mlflow.log_metrics(metrics, step=step)
+            except Exception as e:
+                logger.warning(f"Failed to log metrics to MLflow: {e}")
+            step += 1
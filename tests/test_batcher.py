@@ -0,0 +1,71 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from app.models.batcher import DynamicBatcher
+from app.models.mcqa_model import PredictionError, ValidationError
+
+
+@pytest.fixture
+def mock_model():
+    model = MagicMock()
+    model.config.batch_size_limit = 32
+    model.predict_batch.side_effect = lambda passages, choices_list: [
+        {"predicted_choice": choices[0], "confidence": 1.0} for choices in choices_list
+    ]
+    return model
+
+
+def test_concurrent_requests_share_one_batch(mock_model):
+    batcher = DynamicBatcher(mock_model, max_batch_size=8, max_delay_ms=50)
+    choices_list = [[f"choice_{i}", "b", "c", "d"] for i in range(3)]
+
+    async def run():
+        results = await asyncio.gather(*[
+            batcher.predict("Passage [BLANK].", choices) for choices in choices_list
+        ])
+        await batcher.stop()
+        return results
+
+    results = asyncio.run(run())
+
+    assert mock_model.predict_batch.call_count == 1
+    assert [r["predicted_choice"] for r in results] == ["choice_0", "choice_1", "choice_2"]
+
+
+def test_batch_size_is_capped(mock_model):
+    batcher = DynamicBatcher(mock_model, max_batch_size=2, max_delay_ms=50)
+
+    async def run():
+        await asyncio.gather(*[
+            batcher.predict("Passage [BLANK].", ["a", "b", "c", "d"]) for _ in range(5)
+        ])
+        await batcher.stop()
+
+    asyncio.run(run())
+
+    batch_sizes = [len(call.args[0]) for call in mock_model.predict_batch.call_args_list]
+    assert batch_sizes == [2, 2, 1]
+
+
+def test_validation_error_raised_before_queueing(mock_model):
+    mock_model._validate_passage.side_effect = ValidationError("Passage must contain [BLANK] placeholder")
+    batcher = DynamicBatcher(mock_model)
+
+    with pytest.raises(ValidationError):
+        asyncio.run(batcher.predict("No placeholder", ["a", "b", "c", "d"]))
+
+    mock_model.predict_batch.assert_not_called()
+
+
+def test_prediction_error_propagates_to_callers(mock_model):
+    mock_model.predict_batch.side_effect = PredictionError("Prediction failed")
+    batcher = DynamicBatcher(mock_model, max_delay_ms=1)
+
+    async def run():
+        try:
+            await batcher.predict("Passage [BLANK].", ["a", "b", "c", "d"])
+        finally:
+            await batcher.stop()
+
+    with pytest.raises(PredictionError):
+        asyncio.run(run())
@@ -1,10 +1,15 @@
+import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 
-client = TestClient(app)
 
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as client:
+        yield client
 
-def test_mcqa_predict_single():
+
+def test_mcqa_predict_single(client):
     """
     Test the /mcqa/predict endpoint for a single passage with exactly 4 choices.
 
@@ -29,7 +34,7 @@ def test_mcqa_predict_single():
     assert response.json()["detail"] == "Exactly 4 choices required"
 
 
-def test_mcqa_predict_chunk():
+def test_mcqa_predict_chunk(client):
     """
     Test the /mcqa/predict_chunk endpoint for multiple passages.
 
@@ -1,7 +1,14 @@
 import pytest
 import torch
 from unittest.mock import MagicMock, patch
-from app.models.mcqa_model import MCQAConfig, MCQAModel, ValidationError
+from transformers import BertTokenizerFast
+from app.models.mcqa_model import MCQAConfig, MCQAModel, MCQAModelError, ValidationError
+
+VOCAB = [
+    "[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]",
+    "the", "capital", "of", "is", ".", "france", "germany",
+    "london", "paris", "berlin", "madrid", "rome",
+]
 
 
 @pytest.fixture
@@ -12,13 +19,17 @@ def dummy_model_dir(tmp_path):
 
 
 @pytest.fixture
-def mock_tokenizer_and_model():
+def tokenizer(tmp_path):
+    vocab_file = tmp_path / "vocab.txt"
+    vocab_file.write_text("\n".join(VOCAB) + "\n")
+    return BertTokenizerFast.from_pretrained(str(tmp_path), model_max_length=512)
+
+
+@pytest.fixture
+def mock_tokenizer_and_model(tokenizer):
     with patch("app.models.mcqa_model.AutoTokenizer.from_pretrained") as mock_tok, \
          patch("app.models.mcqa_model.AutoModelForMultipleChoice.from_pretrained") as mock_model:
-        mock_tokenizer = MagicMock()
-        mock_tokenizer.return_value = {"input_ids": torch.ones((1, 4, 5), dtype=torch.long)}
-        mock_tokenizer.model_max_length = 512
-        mock_tok.return_value = mock_tokenizer
+        mock_tok.return_value = tokenizer
 
         mock_model_instance = MagicMock()
         mock_output = MagicMock()
@@ -26,7 +37,7 @@ def mock_tokenizer_and_model():
         mock_model_instance.return_value = mock_output
         mock_model.return_value = mock_model_instance
 
-        yield mock_tok, mock_model, mock_tokenizer, mock_model_instance
+        yield mock_tok, mock_model, tokenizer, mock_model_instance
 
 
 def test_predict_blank_valid(dummy_model_dir, mock_tokenizer_and_model):
@@ -38,10 +49,26 @@ def test_predict_blank_valid(dummy_model_dir, mock_tokenizer_and_model):
 
     result = model.predict_blank(passage, choices)
 
-    assert result["predicted_choice"] == "The capital of France is Paris."
+    assert result["predicted_choice"] == "Paris"
     assert isinstance(result["confidence"], float)
 
 
+def test_slow_tokenizer_rejected(dummy_model_dir, mock_tokenizer_and_model):
+    mock_tok, _, _, _ = mock_tokenizer_and_model
+    mock_tok.return_value = MagicMock(is_fast=False)
+
+    with pytest.raises(MCQAModelError, match="No fast tokenizer"):
+        MCQAModel(MCQAConfig(model_directory=dummy_model_dir))
+
+
+def test_model_parameters_frozen(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+
+    MCQAModel(MCQAConfig(model_directory=dummy_model_dir, enable_warmup=False))
+
+    mock_model_instance.requires_grad_.assert_called_once_with(False)
+
+
 def test_predict_blank_invalid_passage(dummy_model_dir, mock_tokenizer_and_model):
     config = MCQAConfig(model_directory=dummy_model_dir)
     model = MCQAModel(config)
@@ -66,6 +93,16 @@ def test_predict_batch_too_large(dummy_model_dir, mock_tokenizer_and_model):
     with pytest.raises(ValidationError, match="Batch size 2 exceeds limit 1"):
         model.predict_batch(passages, choices_list)
 
+def test_predict_batch_reports_invalid_index(dummy_model_dir, mock_tokenizer_and_model):
+    config = MCQAConfig(model_directory=dummy_model_dir)
+    model = MCQAModel(config)
+
+    passages = ["The capital of France is [BLANK].", "The capital of Germany is [BLANK]."]
+    choices_list = [["London", "Paris", "Berlin", "Madrid"], ["Rome", "Paris", " ", "Madrid"]]
+
+    with pytest.raises(ValidationError, match="Invalid input at index 1: Choice 2 cannot be empty"):
+        model.predict_batch(passages, choices_list)
+
 def test_predict_blank_empty_passage(dummy_model_dir, mock_tokenizer_and_model):
     """Edge case: Passage is empty or whitespace only"""
     config = MCQAConfig(model_directory=dummy_model_dir)
@@ -94,3 +131,341 @@ def test_predict_blank_invalid_number_of_choices(dummy_model_dir, mock_tokenizer
         with pytest.raises(ValidationError, match="Expected 4 choices"):
             model.predict_blank(passage, choices)
 
+
+
+def test_predict_blank_repeated_input_is_cached(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    config = MCQAConfig(model_directory=dummy_model_dir, enable_warmup=False)
+    model = MCQAModel(config)
+
+    passage = "The capital of France is [BLANK]."
+    choices = ["London", "Paris", "Berlin", "Madrid"]
+
+    first = model.predict_blank(passage, choices)
+    second = model.predict_blank(passage, choices)
+
+    assert first == second
+    assert mock_model_instance.call_count == 1
+
+
+def test_predict_blank_cache_disabled(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    config = MCQAConfig(model_directory=dummy_model_dir, cache_size=0, enable_warmup=False)
+    model = MCQAModel(config)
+
+    passage = "The capital of France is [BLANK]."
+    choices = ["London", "Paris", "Berlin", "Madrid"]
+
+    model.predict_blank(passage, choices)
+    model.predict_blank(passage, choices)
+
+    assert mock_model_instance.call_count == 2
+
+
+def test_encode_candidates_matches_full_tokenization(dummy_model_dir, mock_tokenizer_and_model, tokenizer):
+    config = MCQAConfig(model_directory=dummy_model_dir)
+    model = MCQAModel(config)
+
+    choices = ["London", "Paris", "Berlin", "Madrid"]
+    passages = [
+        "The capital of France is [BLANK].",
+        "[BLANK] is the capital of [BLANK].",
+        "The capital of France is [BLANK]s.",
+    ]
+
+    expected = [
+        [tokenizer(passage.replace("[BLANK]", choice))["input_ids"] for choice in choices]
+        for passage in passages
+    ]
+    assert model._encode_candidates(passages, [choices] * len(passages)) == expected
+    assert tokenizer.unk_token_id not in expected[0][0]
+
+
+def test_encode_candidates_does_not_splice_before_symbols(dummy_model_dir, mock_tokenizer_and_model, tokenizer):
+    config = MCQAConfig(model_directory=dummy_model_dir)
+    model = MCQAModel(config)
+
+    choices = ["London", "Paris", "Berlin", "Madrid"]
+    passages = ["The capital is [BLANK]™.", "The capital is [BLANK]€.", "The capital is [BLANK]!"]
+
+    expected = [
+        [tokenizer(passage.replace("[BLANK]", choice))["input_ids"] for choice in choices]
+        for passage in passages
+    ]
+    assert model._encode_candidates(passages, [choices] * len(passages)) == expected
+    assert [model._can_splice(passage.split("[BLANK]")) for passage in passages] == [False, False, True]
+
+
+def test_pad_candidates_matches_tokenizer_pad(dummy_model_dir, mock_tokenizer_and_model, tokenizer):
+    config = MCQAConfig(model_directory=dummy_model_dir)
+    model = MCQAModel(config)
+
+    flat_input_ids = [[2, 5, 6, 3], [2, 12, 3], [2, 3]]
+    expected = tokenizer.pad(
+        {"input_ids": flat_input_ids}, padding="max_length", max_length=8, return_tensors="np"
+    )
+
+    input_ids, attention_mask = model._pad_candidates(flat_input_ids, 8)
+
+    assert (input_ids == expected["input_ids"]).all()
+    assert (attention_mask == expected["attention_mask"]).all()
+
+
+def test_int8_quantization_applied_on_cpu(dummy_model_dir, mock_tokenizer_and_model):
+    config = MCQAConfig(model_directory=dummy_model_dir, device="cpu", quantization="int8")
+
+    with patch("app.models.mcqa_model.torch.ao.quantization.quantize_dynamic") as mock_quantize:
+        model = MCQAModel(config)
+
+    mock_quantize.assert_called_once()
+    assert model.model is mock_quantize.return_value
+
+
+def test_half_precision_quantization_sets_load_dtype(dummy_model_dir, mock_tokenizer_and_model):
+    _, mock_model, _, _ = mock_tokenizer_and_model
+    config = MCQAConfig(model_directory=dummy_model_dir, device="cpu", quantization="bf16")
+
+    MCQAModel(config)
+
+    assert mock_model.call_args.kwargs["dtype"] == torch.bfloat16
+
+
+def test_sdpa_attention_falls_back_to_default(dummy_model_dir, mock_tokenizer_and_model):
+    _, mock_model, _, mock_model_instance = mock_tokenizer_and_model
+    mock_model.side_effect = [ValueError("sdpa not supported"), mock_model_instance]
+
+    model = MCQAModel(MCQAConfig(model_directory=dummy_model_dir, device="cpu"))
+
+    assert model.model is mock_model_instance
+    assert mock_model.call_args_list[0].kwargs["attn_implementation"] == "sdpa"
+    assert "attn_implementation" not in mock_model.call_args_list[1].kwargs
+
+
+def test_unsupported_quantization(dummy_model_dir, mock_tokenizer_and_model):
+    config = MCQAConfig(model_directory=dummy_model_dir, device="cpu", quantization="int3")
+
+    with pytest.raises(ValueError, match="Unsupported quantization"):
+        MCQAModel(config)
+
+
+def test_compile_warms_up_model(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    config = MCQAConfig(model_directory=dummy_model_dir, compile=True)
+
+    with patch("app.models.mcqa_model.torch.compile", side_effect=lambda model, **kwargs: model) as mock_compile:
+        MCQAModel(config)
+
+    mock_compile.assert_called_once()
+    warmup_shapes = {call.kwargs["input_ids"].shape for call in mock_model_instance.call_args_list}
+    assert warmup_shapes == {
+        (batch_size, 4, length) for batch_size in [1, 2, 4, 8, 16, 32] for length in [64, 128, 256, 512]
+    }
+
+
+def test_eager_model_not_warmed_up_on_cpu(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    config = MCQAConfig(model_directory=dummy_model_dir, device="cpu")
+
+    MCQAModel(config)
+
+    mock_model_instance.assert_not_called()
+
+
+def test_compile_failure_falls_back_to_eager(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    config = MCQAConfig(model_directory=dummy_model_dir, compile=True)
+
+    with patch("app.models.mcqa_model.torch.compile", side_effect=RuntimeError("backend unavailable")):
+        model = MCQAModel(config)
+
+    assert model.model is mock_model_instance
+    assert not model.compiled
+
+
+def test_compiled_forward_failure_falls_back_to_eager(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    compiled_model = MagicMock(side_effect=RuntimeError("inductor failed"))
+    config = MCQAConfig(model_directory=dummy_model_dir, compile=True, enable_warmup=False)
+
+    with patch("app.models.mcqa_model.torch.compile", return_value=compiled_model):
+        model = MCQAModel(config)
+
+    assert model.compiled
+    choices = ["London", "Paris", "Berlin", "Madrid"]
+    result = model.predict_blank("The capital of France is [BLANK].", choices)
+
+    assert result["predicted_choice"] == "Paris"
+    compiled_model.assert_called_once()
+    assert model.model is mock_model_instance
+    assert not model.compiled
+    assert model._compiled_executor is None
+
+
+def test_compile_defaults_to_cuda_only(dummy_model_dir, mock_tokenizer_and_model):
+    config = MCQAConfig(model_directory=dummy_model_dir, device="cpu")
+
+    with patch("app.models.mcqa_model.torch.compile") as mock_compile:
+        MCQAModel(config)
+
+    mock_compile.assert_not_called()
+
+
+def test_compiled_model_pads_to_length_bucket(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    config = MCQAConfig(model_directory=dummy_model_dir, compile=True, enable_warmup=False)
+
+    with patch("app.models.mcqa_model.torch.compile", side_effect=lambda model, **kwargs: model):
+        model = MCQAModel(config)
+
+    assert model.length_buckets == [64, 128, 256, 512]
+
+    model.predict_blank("The capital of France is [BLANK].", ["London", "Paris", "Berlin", "Madrid"])
+
+    assert mock_model_instance.call_args.kwargs["input_ids"].shape == (1, 4, 64)
+
+
+def test_compiled_model_pads_batch_to_bucket(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    mock_model_instance.side_effect = lambda **inputs: MagicMock(logits=inputs["attention_mask"].sum(-1).float())
+    config = MCQAConfig(model_directory=dummy_model_dir, compile=True, enable_warmup=False, cache_size=0)
+
+    with patch("app.models.mcqa_model.torch.compile", side_effect=lambda model, **kwargs: model):
+        model = MCQAModel(config)
+
+    assert model.batch_buckets == [1, 2, 4, 8, 16, 32]
+
+    choices = ["London", "Paris", "Rome Rome", "Madrid"]
+    results = model.predict_batch(["The capital of France is [BLANK]."] * 3, [choices] * 3)
+
+    assert mock_model_instance.call_args.kwargs["input_ids"].shape == (4, 4, 64)
+    assert [r["predicted_choice"] for r in results] == ["Rome Rome"] * 3
+
+
+def test_cpu_inference_does_not_take_staging_lock(dummy_model_dir, mock_tokenizer_and_model):
+    config = MCQAConfig(model_directory=dummy_model_dir, device="cpu", cache_size=0)
+    model = MCQAModel(config)
+    model._inference_lock = MagicMock()
+
+    model.predict_blank("The capital of France is [BLANK].", ["London", "Paris", "Berlin", "Madrid"])
+
+    model._inference_lock.__enter__.assert_not_called()
+
+
+def test_predict_blank_without_scores(dummy_model_dir, mock_tokenizer_and_model):
+    config = MCQAConfig(model_directory=dummy_model_dir)
+    model = MCQAModel(config)
+
+    passage = "The capital of France is [BLANK]."
+    choices = ["London", "Paris", "Berlin", "Madrid"]
+
+    with patch("app.models.mcqa_model.torch.log_softmax") as mock_softmax:
+        result = model.predict_blank(passage, choices, return_scores=False)
+
+    assert result == {"predicted_choice": "Paris"}
+    mock_softmax.assert_not_called()
+    assert "confidence" in model.predict_blank(passage, choices)
+
+
+def test_predict_batch_groups_by_length_and_keeps_order(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    # Score each candidate by its unpadded length, so the longest choice wins.
+    mock_model_instance.side_effect = lambda **inputs: MagicMock(logits=inputs["attention_mask"].sum(-1).float())
+
+    config = MCQAConfig(model_directory=dummy_model_dir, enable_warmup=False)
+    model = MCQAModel(config)
+
+    passages, choices_list, expected = [], [], []
+    for i in range(16):
+        passages.append("The capital of France is [BLANK]." + " the capital" * i)
+        choices = ["London", "Paris", "Berlin", "Madrid"]
+        choices[i % 4] = "Rome Rome"
+        choices_list.append(choices)
+        expected.append("Rome Rome")
+
+    results = model.predict_batch(passages, choices_list)
+
+    assert [r["predicted_choice"] for r in results] == expected
+    assert mock_model_instance.call_count == 2
+    short_group, long_group = [call.kwargs["input_ids"].shape[-1] for call in mock_model_instance.call_args_list]
+    assert short_group < long_group
+
+
+def test_predict_batch_of_similar_lengths_runs_one_pass(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    mock_model_instance.return_value = MagicMock(logits=torch.zeros(32, 4))
+
+    config = MCQAConfig(model_directory=dummy_model_dir, enable_warmup=False)
+    model = MCQAModel(config)
+
+    passages = [f"The capital of {country} is [BLANK]." for country in ["France", "Germany"] * 16]
+    choices_list = [["London", "Paris", "Berlin", "Madrid"]] * 32
+
+    model.predict_batch(passages, choices_list)
+
+    assert mock_model_instance.call_count == 1
+
+
+def test_choice_token_ids_are_cached(dummy_model_dir, mock_tokenizer_and_model):
+    config = MCQAConfig(model_directory=dummy_model_dir, cache_size=0)
+    model = MCQAModel(config)
+
+    choices = ["London", "Paris", "Berlin", "Madrid"]
+    with patch.object(model, "_token_ids", wraps=model._token_ids) as mock_token_ids:
+        model.predict_blank("The capital of France is [BLANK].", choices)
+        model.predict_blank("The capital of Germany is [BLANK].", choices)
+
+    choice_calls = [call for call in mock_token_ids.call_args_list if call.args[0] == choices]
+    assert len(choice_calls) == 1
+    assert list(model._choice_cache) == choices
+
+
+def test_onnx_session_used_when_exported_model_present(dummy_model_dir, mock_tokenizer_and_model):
+    _, mock_model, _, _ = mock_tokenizer_and_model
+    (dummy_model_dir / "model.onnx").write_bytes(b"")
+
+    mock_ort = MagicMock()
+    mock_ort.get_available_providers.return_value = ["CPUExecutionProvider"]
+    session = mock_ort.InferenceSession.return_value
+    input_ids, attention_mask = MagicMock(), MagicMock()
+    input_ids.name, attention_mask.name = "input_ids", "attention_mask"
+    session.get_inputs.return_value = [input_ids, attention_mask]
+    session.run.return_value = [torch.tensor([[0.1, 0.9, 0.0, -0.5]]).numpy()]
+
+    with patch.dict("sys.modules", {"onnxruntime": mock_ort}):
+        model = MCQAModel(MCQAConfig(model_directory=dummy_model_dir))
+
+    result = model.predict_blank("The capital of France is [BLANK].", ["London", "Paris", "Berlin", "Madrid"])
+
+    assert result["predicted_choice"] == "Paris"
+    mock_model.assert_not_called()
+    output_names, inputs = session.run.call_args.args
+    assert output_names == ["logits"]
+    assert set(inputs) == {"input_ids", "attention_mask"}
+
+
+def test_identical_candidates_skip_forward_pass(dummy_model_dir, mock_tokenizer_and_model):
+    _, _, _, mock_model_instance = mock_tokenizer_and_model
+    config = MCQAConfig(model_directory=dummy_model_dir, max_length=8, enable_warmup=False)
+    model = MCQAModel(config)
+
+    passage = "The capital of France is the capital of [BLANK]."
+    result = model.predict_blank(passage, ["London", "Paris", "Berlin", "Madrid"])
+
+    assert result == {"predicted_choice": "London", "confidence": 0.25}
+    mock_model_instance.assert_not_called()
+
+    model.predict_blank("France is [BLANK].", ["London", "Paris", "Berlin", "Madrid"])
+    mock_model_instance.assert_called_once()
+
+
+def test_prediction_metrics_logged_once_per_call(dummy_model_dir, mock_tokenizer_and_model):
+    config = MCQAConfig(model_directory=dummy_model_dir, mlflow_tracking_uri="file:./mlruns_test")
+
+    with patch("app.models.mcqa_model.MetricLogger") as mock_metric_logger:
+        model = MCQAModel(config)
+        model.predict_blank("The capital of France is [BLANK].", ["London", "Paris", "Berlin", "Madrid"])
+
+    metric_logger = mock_metric_logger.return_value
+    metric_logger.log_metrics.assert_called_once()
+    metrics = metric_logger.log_metrics.call_args.args[0]
+    assert set(metrics) == {"mcqa/latency_ms", "mcqa/batch_size", "mcqa/confidence_0"}
@@ -0,0 +1,50 @@
+import threading
+import time
+from unittest.mock import patch
+from app.utils.metrics import MetricLogger
+
+
+def test_metrics_logged_from_background_thread():
+    logged = []
+
+    def record(metrics, step):
+        logged.append((metrics, step, threading.current_thread().name))
+
+    with patch("app.utils.metrics.mlflow.log_metrics", side_effect=record):
+        metric_logger = MetricLogger()
+        metric_logger.log_metrics({"latency_ms": 12.5})
+        metric_logger.log_metrics({"latency_ms": 7.0})
+        metric_logger.stop()
+
+    assert [(metrics, step) for metrics, step, _ in logged] == [
+        ({"latency_ms": 12.5}, 0),
+        ({"latency_ms": 7.0}, 1),
+    ]
+    assert all(name == "mlflow-metrics" for _, _, name in logged)
+
+
+def test_logging_failure_does_not_stop_worker():
+    with patch("app.utils.metrics.mlflow.log_metrics", side_effect=[RuntimeError("store down"), None]) as mock_log:
+        metric_logger = MetricLogger()
+        metric_logger.log_metrics({"latency_ms": 1.0})
+        metric_logger.log_metrics({"latency_ms": 2.0})
+        metric_logger.stop()
+
+    assert mock_log.call_count == 2
+
+
+def test_stop_does_not_hang_on_full_queue():
+    release = threading.Event()
+
+    with patch("app.utils.metrics.mlflow.log_metrics", side_effect=lambda metrics, step: release.wait()):
+        metric_logger = MetricLogger(max_queue_size=1)
+        metric_logger.log_metrics({"latency_ms": 1.0})
+        time.sleep(0.05)
+        metric_logger.log_metrics({"latency_ms": 2.0})
+
+        start = time.monotonic()
+        metric_logger.stop(timeout=0.2)
+        elapsed = time.monotonic() - start
+        release.set()
+
+    assert elapsed < 1.0
@@ -0,0 +1,67 @@
+from unittest.mock import MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.endpoints.mcqa_endpoints import ROUTER
+from app.models.model_loader import create_mcqa_model, load_mcqa_model, log_model_to_mlflow
+
+
+def test_load_mcqa_model_returns_shared_instance():
+    load_mcqa_model.cache_clear()
+    try:
+        with patch("app.models.model_loader.MCQAModel") as mock_model_cls:
+            first = load_mcqa_model()
+            second = load_mcqa_model()
+
+        assert first is second
+        mock_model_cls.assert_called_once()
+    finally:
+        load_mcqa_model.cache_clear()
+
+
+def test_injected_model_does_not_replace_shared_instance():
+    load_mcqa_model.cache_clear()
+    try:
+        with patch("app.models.model_loader.MCQAModel") as mock_model_cls:
+            mock_model_cls.side_effect = lambda *args, **kwargs: MagicMock()
+            shared = load_mcqa_model()
+            injected = create_mcqa_model(MagicMock())
+
+            assert injected is not shared
+            assert load_mcqa_model() is shared
+        assert mock_model_cls.call_count == 2
+    finally:
+        load_mcqa_model.cache_clear()
+
+
+def test_router_without_lifespan_uses_shared_model():
+    app = FastAPI()
+    app.include_router(ROUTER)
+
+    with patch("app.endpoints.mcqa_endpoints.load_mcqa_model") as mock_load:
+        mock_load.return_value.config.batch_size_limit = 32
+        mock_load.return_value.predict_batch.return_value = [{"predicted_choice": "Paris"}]
+        with TestClient(app) as client:
+            chunk_response = client.post("/mcqa/predict_chunk", json={
+                "passages": ["The capital of France is [BLANK]."],
+                "choices_list": [["London", "Paris", "Berlin", "Madrid"]]
+            })
+            predict_response = client.post("/mcqa/predict", json={
+                "passage": "The capital of France is [BLANK].",
+                "choices": ["London", "Paris", "Berlin", "Madrid"]
+            })
+
+    assert chunk_response.status_code == 200
+    assert predict_response.status_code == 200
+    assert predict_response.json()["prediction"]["predicted_choice"] == "Paris"
+    mock_load.assert_called_with()
+    assert app.state.mcqa_batcher.model is mock_load.return_value
+
+
+def test_log_model_failure_does_not_raise():
+    mcqa_model = MagicMock()
+
+    with patch("app.models.model_loader.mlflow") as mock_mlflow:
+        mock_mlflow.pytorch.log_model.side_effect = OSError("tracking server unreachable")
+        log_model_to_mlflow(mcqa_model, "http://localhost:5000")
+
+    mock_mlflow.pytorch.log_model.assert_called_once()